@@ -8,11 +8,26 @@ import queue
 import math
 import traceback
 import sys
+import atexit
+import signal
 # tkinter 관련 import 모두 제거
 from datetime import datetime, timedelta
-import pytz
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from zoneinfo import ZoneInfo
 import yfinance as yf
 import pandas as pd
+import numpy as np
+try:
+    from numba import njit
+except ImportError:
+    # numba 미설치 환경(Termux 등)에서는 순수 파이썬으로 동작
+    def njit(*args, **kwargs):
+        return lambda f: f
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # [B] 절대 경로 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -25,12 +40,33 @@ SECRETS_FILE = os.path.join(BASE_DIR, "secrets.json")
 STATUS_FILE = os.path.join(BASE_DIR, "status_us.json")
 LOG_FILE_NAME = os.path.join(BASE_DIR, f"log_us_{datetime.now().strftime('%Y%m%d')}.txt")
 TOKEN_FILE = os.path.join(BASE_DIR, f"token_{MODE}.json")
+KIS_TIMEOUT = (3, 10)  # (연결, 응답) 초
+NY_TZ = ZoneInfo('America/New_York')
+
+# 뉴욕 기준 분 단위 시각 (hour*60 + minute)
+MIN_PRE_OPEN = 569       # 09:29 일봉 선조회
+MIN_OPEN = 570           # 09:30 장 시작
+MIN_PHASE_A_END = 580    # 09:40
+MIN_PHASE_C_START = 950  # 15:50
+MIN_CLOSE = 960          # 16:00 장 마감
+MIN_CLOSE_NOTICE = 965   # 16:05 종료 안내
+
+# 디스코드 웹훅 주소 (주문마다 secrets.json 을 다시 읽지 않도록 1회 로드)
+try:
+    with open(SECRETS_FILE, 'r', encoding='utf-8') as f:
+        _secrets = json.load(f)
+    DISCORD_URL = _secrets.get(MODE, {}).get("DISCORD_WEBHOOK") or _secrets.get("DISCORD_WEBHOOK")
+except:
+    DISCORD_URL = None
 
 # [수정됨] 타겟 종목 및 거래소 정보 (문서 기준 NASD, AMEX)
 TARGETS = [
     {"symbol": "TQQQ", "exch": "NASD"}, # 나스닥은 NAS가 아니라 NASD
     {"symbol": "SOXL", "exch": "AMEX"}  # 아멕스/Arca는 AMS가 아니라 AMEX
 ]
+SYMBOL_IDX = {t['symbol']: i for i, t in enumerate(TARGETS)}
+SYMBOLS = np.array([t['symbol'] for t in TARGETS])
+EXCHS = np.array([t['exch'] for t in TARGETS])
 
 # 로깅 설정
 logging.basicConfig(
@@ -51,25 +87,52 @@ def print_log(msg):
     print(msg) 
     logging.info(msg)
 
+def json_loads(raw):
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def json_dumps(obj):
+    # 파일 기록용 bytes 반환 (orjson 이 없으면 표준 json 으로 동일한 compact 형식)
+    if orjson: return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def single_flight(key, fetch):
+    # 같은 key 로 동시에 들어온 요청은 한 번만 실행하고 나머지는 그 결과를 함께 사용
+    with _inflight_lock:
+        entry = _inflight.get(key)
+        leader = entry is None
+        if leader:
+            entry = _inflight[key] = [threading.Event(), None]
+    if not leader:
+        entry[0].wait()
+        return entry[1]
+    try:
+        entry[1] = fetch()
+        return entry[1]
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        entry[0].set()
+
 def send_discord(msg):
+    if not DISCORD_URL: return
     try:
-        with open(SECRETS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            url = data.get(MODE, {}).get("DISCORD_WEBHOOK") or data.get("DISCORD_WEBHOOK")
-        if url: requests.post(url, json={"content": msg})
+        requests.post(DISCORD_URL, json={"content": msg}, timeout=3)
     except: pass
 
 def get_market_status():
-    ny_tz = pytz.timezone('America/New_York')
-    now_ny = datetime.now(ny_tz)
+    now_ny = datetime.now(NY_TZ)
+    current_time = f"{now_ny.hour:02d}:{now_ny.minute:02d}"
     
     # 요일 체크 (0:월 ~ 4:금, 5:토, 6:일)
     if now_ny.weekday() >= 5:
-        return False, now_ny.strftime("%H:%M") + " (주말)"
+        return False, current_time + " (주말)"
     
-    # 시간 체크
-    current_time = now_ny.strftime("%H:%M")
-    is_open = "09:30" <= current_time < "16:00"
+    # 시간 체크 (분 단위 정수 비교)
+    minutes = now_ny.hour * 60 + now_ny.minute
+    is_open = MIN_OPEN <= minutes < MIN_CLOSE
     return is_open, current_time
 
 # ==========================================
@@ -80,46 +143,84 @@ class StatusManager:
         self.file = STATUS_FILE
         self.lock = threading.Lock()
         self.data = self._load()
-        self.pending_buys = {} 
+        # 가상잔고 (종목 인덱스 기준 배열: SYMBOL_IDX)
+        n = len(TARGETS)
+        self._pending_qty = np.zeros(n, dtype=np.int64)
+        self._pending_time = np.zeros(n)
+        self._pending_initial = np.zeros(n, dtype=np.int64)
+        self._pending_active = np.zeros(n, dtype=bool)
+        self._dirty = False
+        self._dirty_seq = 0  # _save 호출마다 증가 (기록 도중 들어온 변경 구분용)
+        self._write_lock = threading.Lock()  # 주기 기록 / reset_daily / atexit 기록 직렬화
+        # 변경 사항은 10초 주기로 모아서 디스크에 기록 (Termux 저장장치 쓰기 최소화)
+        flush_t = threading.Thread(target=self._flush_loop)
+        flush_t.daemon = True
+        flush_t.start()
+        atexit.register(self._flush_if_dirty)
 
     def _load(self):
         if os.path.exists(self.file):
             try:
-                with open(self.file, 'r') as f: return json.load(f)
+                with open(self.file, 'rb') as f: return json_loads(f.read())
             except: pass
-        return {"phase_a_done": False, "max_profit": {}, "ignore_list": {}}
+        return {"phase_a_done": False, "phase_c_date": None, "max_profit": {}, "ignore_list": {}}
 
     def _save(self):
-        try:
-            with open(self.file, 'w') as f: json.dump(self.data, f, indent=4)
-        except: pass
+        # self.lock 을 잡은 상태에서 호출됨. 실제 기록은 _flush_if_dirty 에서 수행
+        self._dirty = True
+        self._dirty_seq += 1
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(10.0)
+            self._flush_if_dirty()
+
+    def _flush_if_dirty(self):
+        # 직렬화~교체까지 한 번에 하나만 수행하여 오래된 내용이 최신 파일을 덮어쓰지 않도록 함
+        with self._write_lock:
+            # 임시 파일에 쓴 뒤 교체하여 기록 도중 종료되어도 파일이 깨지지 않도록 함
+            tmp = self.file + ".tmp"
+            try:
+                with self.lock:
+                    if not self._dirty: return
+                    payload = json_dumps(self.data)
+                    seq = self._dirty_seq
+                with open(tmp, 'wb') as f: f.write(payload)
+                os.replace(tmp, self.file)
+            except Exception as e:
+                # 직렬화/기록 실패 시 dirty 유지 -> 다음 주기에 재시도 (기록 스레드는 계속 동작)
+                print_log(f"⚠️ [상태저장] 기록 실패: {e}")
+                return
+            with self.lock:
+                # 기록 도중 새 변경이 없었을 때만 dirty 해제
+                if self._dirty_seq == seq: self._dirty = False
 
     def record_pending_buy(self, symbol, qty, current_qty):
+        i = SYMBOL_IDX[symbol]
         with self.lock:
-            self.pending_buys[symbol] = {
-                'qty': qty,
-                'time': time.time(),
-                'initial_qty': current_qty 
-            }
+            self._pending_qty[i] = qty
+            self._pending_time[i] = time.time()
+            self._pending_initial[i] = current_qty
+            self._pending_active[i] = True
             print_log(f"📝 [가상잔고] {symbol} +{qty}주 기록 (API 반영 대기)")
 
     def get_virtual_qty(self, symbol, current_qty):
+        i = SYMBOL_IDX.get(symbol)
         with self.lock:
-            if symbol not in self.pending_buys:
+            if i is None or not self._pending_active[i]:
                 return current_qty
             
-            info = self.pending_buys[symbol]
-            if current_qty > info['initial_qty']:
+            if current_qty > self._pending_initial[i]:
                 print_log(f"✅ [동기화완료] {symbol} 잔고 업데이트 확인.")
-                del self.pending_buys[symbol]
+                self._pending_active[i] = False
                 return current_qty
             
-            if time.time() - info['time'] > 600:
+            if time.time() - self._pending_time[i] > 600:
                 print_log(f"⚠️ [타임아웃] {symbol} 잔고 미반영 -> 가상잔고 삭제")
-                del self.pending_buys[symbol]
+                self._pending_active[i] = False
                 return current_qty
             
-            return current_qty + info['qty']
+            return current_qty + int(self._pending_qty[i])
 
     def get_max_profit(self, symbol):
         with self.lock: return self.data["max_profit"].get(symbol, 0.0)
@@ -142,14 +243,28 @@ class StatusManager:
         with self.lock:
             self.data["phase_a_done"] = done
             self._save()
+
+    def set_phase_c_date(self, day):
+        # Phase C 를 마친 뉴욕 날짜 (ISO 문자열). 16:00 리셋 전에 종료/재시작해도 다음 날 판단이 막히지 않음
+        with self.lock:
+            self.data["phase_c_date"] = day
+            self._save()
+
+    def set_notified_1605(self, done=True):
+        with self.lock:
+            self.data["notified_1605"] = done
+            self._save()
     
     def reset_daily(self):
         with self.lock:
             self.data["phase_a_done"] = False
+            self.data["notified_1605"] = False
             self.data["max_profit"] = {}
             self.data["ignore_list"] = {}
-            self.pending_buys = {}
+            self._pending_active[:] = False
             self._save()
+        # 일일 리셋은 즉시 기록
+        self._flush_if_dirty()
 
     def set_ignore_sync(self, symbol, duration=3600):
         with self.lock:
@@ -158,11 +273,10 @@ class StatusManager:
             self._save()
             print_log(f"🛡️ [동기화] {symbol} {int(duration/60)}분간 잔고 동기화 제외")
 
-    def is_sync_ignored(self, symbol):
+    def snapshot_ignore(self):
+        # 전략 루프 1회차 동안 잠금 없이 읽을 수 있도록 복사본 반환
         with self.lock:
-            expire = self.data.get("ignore_list", {}).get(symbol, 0)
-            if time.time() < expire: return True
-            return False
+            return dict(self.data.get("ignore_list", {}))
 
 status_mgr = StatusManager()
 
@@ -170,26 +284,46 @@ status_mgr = StatusManager()
 # [4. 데이터 Provider]
 # ==========================================
 class DataProvider:
-    _cache = {}
-    _cache_duration = 300  # 5분 캐싱
+    _cache = {}  # symbol -> (일봉, 만료시각)
+    _cache_duration = 300  # 5분 캐싱 (장중: 당일 봉이 계속 변함)
+    _closed_cache_duration = 6 * 3600  # 장 마감 중에는 일봉이 바뀌지 않음
+    _ticker_cache = {}
+    _ticker_lock = threading.Lock()  # 입력 스레드 / 전략 스레드 동시 접근
+    _price_cache = {}  # symbol -> (price, 조회시각)
+    _price_ttl = 10.0
 
     @staticmethod
-    def get_current_price(symbol):
+    def _ticker(symbol):
+        # yf.Ticker 생성 시 세션/쿠키 협상이 반복되지 않도록 종목별로 재사용
+        with DataProvider._ticker_lock:
+            ticker = DataProvider._ticker_cache.get(symbol)
+            if ticker is None:
+                ticker = yf.Ticker(symbol)
+                DataProvider._ticker_cache[symbol] = ticker
+            return ticker
+
+    @classmethod
+    def get_current_price(cls, symbol):
+        # 같은 명령 안에서 반복 조회 시 HTTP 왕복 생략 (10초 캐싱)
+        cached = cls._price_cache.get(symbol)
+        if cached and time.time() - cached[1] < cls._price_ttl:
+            return cached[0]
+        return single_flight(('price', symbol), lambda: cls._fetch_price(symbol))
+
+    @classmethod
+    def _fetch_price(cls, symbol):
         # 3회 재시도
         for attempt in range(3):
             try:
-                ticker = yf.Ticker(symbol)
-                
-                # 1. 실시간 가격 시도 (fast_info)
-                price = ticker.fast_info.get('last_price', None)
-                if price and price > 0: 
-                    return float(price)
+                ticker = cls._ticker(symbol)
                 
-                # 2. 실패 시(주말 등), 최근 종가 가져오기 (history)
+                # 당일 봉 종가 = 장중 현재가 / 장 마감 후(주말 등) 최근 종가
+                # (fast_info 는 Ticker 마다 첫 조회값을 메모하므로 재사용 Ticker 에서는 사용하지 않음)
                 hist = ticker.history(period="1d")
                 if not hist.empty:
-                    close_price = hist['Close'].iloc[-1]
-                    return float(close_price)
+                    close_price = float(hist['Close'].iloc[-1])
+                    cls._price_cache[symbol] = (close_price, time.time())
+                    return close_price
                     
             except: 
                 time.sleep(0.5)
@@ -197,24 +331,111 @@ class DataProvider:
         return None
 
     @classmethod
-    def get_daily_history(cls, symbol, days=130):
+    def _history_start(cls, days):
+        # 필요한 봉 수만큼만 받도록 시작일 계산 (주말/휴일 여유 포함, 지표 계산 최소 130봉)
+        bars = max(days, 130)
+        return (datetime.now() - timedelta(days=bars * 7 // 5 + 15)).strftime('%Y-%m-%d')
+
+    @classmethod
+    def get_current_prices(cls, symbols):
+        # 종목별 조회를 동시에 실행 (TTL 캐시/중복 요청 합치기는 get_current_price 가 처리, 실패 종목은 제외)
+        prices = {}
+        if not symbols: return prices
+        with ThreadPoolExecutor(max_workers=len(symbols)) as ex:
+            for sym, price in zip(symbols, ex.map(cls.get_current_price, symbols)):
+                if price: prices[sym] = price
+        return prices
+
+    @staticmethod
+    def _downcast(hist):
+        # 캐시 메모리 절감용 float32 변환 (지표 계산 시 float64 로 다시 올림)
+        cols = [c for c in ('Open', 'High', 'Low', 'Close', 'Volume') if c in hist.columns]
+        return hist.astype({c: 'float32' for c in cols})
+
+    @classmethod
+    def prefetch_histories(cls, symbols, days=130):
+        # 캐시가 없거나 만료된 종목만 한 번의 요청으로 받아 _cache 를 채움 (실패 시 개별 조회로 대체)
+        symbols = [sym for sym in symbols if cls._cached_history(sym, days) is None]
+        if not symbols: return
+        expires_at = cls._history_expiry()
+        try:
+            data = yf.download(" ".join(symbols), start=cls._history_start(days), group_by='ticker',
+                               threads=True, progress=False, auto_adjust=True, actions=False)
+        except Exception as e:
+            print_log(f"⚠️ [Data] 일괄 조회 에러: {e}")
+            return
+        if data is None or data.empty: return
+
+        for sym in symbols:
+            try:
+                hist = data[sym] if isinstance(data.columns, pd.MultiIndex) else data
+                hist = hist.dropna(how='all')
+            except KeyError:
+                continue
+            if len(hist) >= days:
+                hist = cls._downcast(hist)
+                hist.attrs['symbol'] = sym
+                cls._cache[sym] = (hist, expires_at)
+
+    @classmethod
+    def prefetch_daily_history(cls, symbols, days=130):
+        # 일괄 다운로드 후 누락된 종목만 개별 조회를 동시에 실행 (이후 조회는 캐시 사용)
+        cls.prefetch_histories(symbols, days)
+        with ThreadPoolExecutor(max_workers=len(symbols)) as ex:
+            list(ex.map(lambda sym: cls.get_daily_history(sym, days), symbols))
+
+    @classmethod
+    def _history_expiry(cls):
+        # 조회 시점의 장 상태로 만료 시각 결정
+        # 장중: 5분 후 (16:00 마감을 넘기지 않음) / 장 마감: 6시간 후 (다음 09:30 개장을 넘기지 않음)
+        # 09:29 선조회분은 Phase A(~09:40) 동안 사용하도록 09:40 까지 유지
         now = time.time()
+        now_ny = datetime.now(NY_TZ)
+        minutes = now_ny.hour * 60 + now_ny.minute
+        if now_ny.weekday() < 5 and MIN_PRE_OPEN <= minutes < MIN_OPEN:
+            return now_ny.replace(hour=MIN_PHASE_A_END // 60, minute=MIN_PHASE_A_END % 60, second=0, microsecond=0).timestamp()
+        if now_ny.weekday() < 5 and MIN_OPEN <= minutes < MIN_CLOSE:
+            close_ts = now_ny.replace(hour=16, minute=0, second=0, microsecond=0).timestamp()
+            return min(now + cls._cache_duration, close_ts)
+        day = now_ny.date()
+        if now_ny.weekday() >= 5 or minutes >= MIN_CLOSE: day += timedelta(days=1)
+        while day.weekday() >= 5: day += timedelta(days=1)
+        open_ts = datetime(day.year, day.month, day.day, 9, 30, tzinfo=NY_TZ).timestamp()
+        return min(now + cls._closed_cache_duration, open_ts)
+
+    @classmethod
+    def _cached_history(cls, symbol, days):
+        # 유효한 캐시가 있으면 반환, 없거나 만료/봉 수 부족이면 None
         if symbol in cls._cache:
-            cached_data, cached_time = cls._cache[symbol]
-            if (now - cached_time < cls._cache_duration) and (len(cached_data) >= days):
+            cached_data, expires_at = cls._cache[symbol]
+            if (time.time() < expires_at) and (len(cached_data) >= days):
                 return cached_data
+        return None
+
+    @classmethod
+    def get_daily_history(cls, symbol, days=130):
+        cached_data = cls._cached_history(symbol, days)
+        if cached_data is not None: return cached_data
+        return single_flight(('history', symbol, days), lambda: cls._fetch_daily_history(symbol, days))
 
+    @classmethod
+    def _fetch_daily_history(cls, symbol, days):
+        expires_at = cls._history_expiry()
         for attempt in range(3):
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period="1y") 
+                ticker = cls._ticker(symbol)
+                hist = ticker.history(start=cls._history_start(days), actions=False)
+                if hist is not None and 0 < len(hist) < days:
+                    hist = ticker.history(period="1y", actions=False)
                 
                 if hist is not None and not hist.empty:
                     if len(hist) < days:
                          print_log(f"⚠️ [Data] {symbol} 데이터 부족 (확보:{len(hist)} < 필요:{days})")
                          return None
                     
-                    cls._cache[symbol] = (hist, now)
+                    hist = cls._downcast(hist)
+                    hist.attrs['symbol'] = symbol
+                    cls._cache[symbol] = (hist, expires_at)
                     return hist 
             except Exception as e:
                 if attempt == 2: print_log(f"⚠️ [Data] {symbol} 조회 에러: {e}")
@@ -232,13 +453,20 @@ class KisUS:
         self.base_url = self.cfg['URL_BASE']
         self.token = None
         self.token_file = TOKEN_FILE
+        # 매 요청마다 TCP/TLS 연결을 새로 맺지 않도록 세션 재사용 (keep-alive)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._balance_cache = None  # (holdings, cash, 조회시각)
+        self._balance_ttl = 150  # 전략 루프 주기(60초)보다 길게 -> 주문/취소가 없는 회차는 캐시 사용
         self.get_access_token()
 
     def get_access_token(self):
         if os.path.exists(self.token_file):
             try:
-                with open(self.token_file, 'r') as f:
-                    data = json.load(f)
+                with open(self.token_file, 'rb') as f:
+                    data = json_loads(f.read())
                 saved = datetime.fromisoformat(data['timestamp'])
                 if datetime.now() < saved + timedelta(hours=23):
                     self.token = data['access_token']
@@ -253,11 +481,11 @@ class KisUS:
             "appsecret": self.cfg['APP_SECRET']
         }
         try:
-            res = requests.post(url, json=body).json()
+            res = self.session.post(url, json=body, timeout=KIS_TIMEOUT).json()
             if 'access_token' in res:
                 self.token = res['access_token']
-                with open(self.token_file, 'w') as f:
-                    json.dump({"access_token": self.token, "timestamp": datetime.now().isoformat()}, f)
+                with open(self.token_file, 'wb') as f:
+                    f.write(json_dumps({"access_token": self.token, "timestamp": datetime.now().isoformat()}))
                 print_log("🔑 새 토큰 발급 완료")
             else:
                 print_log(f"❌ 토큰 발급 응답 오류: {res}")
@@ -287,7 +515,7 @@ class KisUS:
             "TR_CRCY_CD": "USD"
         }
         try:
-            res = requests.get(url, headers=headers, params=params)
+            res = self.session.get(url, headers=headers, params=params, timeout=KIS_TIMEOUT)
             if res.status_code == 200:
                 data = res.json()
                 if data['rt_cd'] == '0':
@@ -296,6 +524,22 @@ class KisUS:
         return 0.0
 
     def get_balance(self):
+        # 150초 이내 재조회는 캐시 사용 (주문/정정/취소 시 무효화, 외부 거래는 최대 150초 후 반영)
+        cached = self._balance_cache
+        if cached and time.time() - cached[2] < self._balance_ttl:
+            return cached[0], cached[1]
+
+        holdings = self._fetch_holdings()
+        if holdings is None: return {}, 0.0
+        cash = self.get_buyable_cash()
+        self._balance_cache = (holdings, cash, time.time())
+        return holdings, cash
+
+    def invalidate_balance(self):
+        self._balance_cache = None
+
+    def _fetch_holdings(self):
+        # 잔고(inquire-balance)만 조회. 실패 시 None
         url = f"{self.base_url}/uapi/overseas-stock/v1/trading/inquire-balance"
         tr_id = "TTTS3012R" if "REAL" in MODE else "VTTS3012R"
         headers = self.get_header(tr_id)
@@ -307,11 +551,10 @@ class KisUS:
             "CTX_AREA_FK200": "",
             "CTX_AREA_NK200": ""
         }
-        holdings = {}
-        cash = 0.0
         try:
-            res = requests.get(url, headers=headers, params=params).json()
+            res = self.session.get(url, headers=headers, params=params, timeout=KIS_TIMEOUT).json()
             if res['rt_cd'] == '0':
+                holdings = {}
                 for item in res['output1']:
                     qty = float(item['ovrs_cblc_qty'])
                     if qty > 0:
@@ -325,16 +568,19 @@ class KisUS:
                             "profit_rate": profit_rate,
                             "eval_amt": evlu_amt
                         }
-                cash = self.get_buyable_cash()
+                return holdings
             else:
                 print_log(f"❌ 잔고 조회 실패: {res['msg1']}")
         except Exception as e:
             print_log(f"❌ 잔고 조회 에러: {e}")
             print_log(traceback.format_exc())
             
-        return holdings, cash
+        return None
 
     def get_open_orders(self, symbol, exch):
+        return single_flight(('open_orders', symbol, exch), lambda: self._fetch_open_orders(symbol, exch))
+
+    def _fetch_open_orders(self, symbol, exch):
         url = f"{self.base_url}/uapi/overseas-stock/v1/trading/inquire-nccs"
         tr_id = "TTTS3018R" if "REAL" in MODE else "VTTS3018R"
         headers = self.get_header(tr_id)
@@ -344,32 +590,70 @@ class KisUS:
             "CTX_AREA_FK200": "", "CTX_AREA_NK200": ""
         }
         try:
-            res = requests.get(url, headers=headers, params=params).json()
+            res = self.session.get(url, headers=headers, params=params, timeout=KIS_TIMEOUT).json()
             if res['rt_cd'] == '0':
                 return [ord for ord in res['output'] if ord['pdno'] == symbol]
         except: pass
         return []
 
-    def cancel_all_orders(self, symbol, exch):
-        orders = self.get_open_orders(symbol, exch)
+    def cancel_all_orders(self, symbol, exch, orders=None):
+        if orders is None: orders = self.get_open_orders(symbol, exch)
         if not orders: 
             print_log(f"   {symbol} 취소할 미체결 내역 없음.")
             return
 
         print_log(f"🧹 {symbol} 미체결 주문 {len(orders)}건 취소 실행...")
-        url_cancel = f"{self.base_url}/uapi/overseas-stock/v1/trading/order-rvsecncl"
         tr_id = "TTTT1004U" if "REAL" in MODE else "VTTT1004U" 
         headers_cancel = self.get_header(tr_id)
-        for ord in orders:
-            data = {
-                "CANO": self.cfg['CANO'], "ACNT_PRDT_CD": self.cfg['ACNT_PRDT_CD'],
-                "OVRS_EXCG_CD": exch, "PDNO": symbol, "ORGN_ODNO": ord['odno'],
-                "RVSE_CNCL_DVSN_CD": "02", "ORD_QTY": str(ord['nccs_qty']), "OVRS_ORD_UNPR": "0", "ORD_SVR_DVSN_CD": "0"
-            }
-            requests.post(url_cancel, headers=headers_cancel, json=data)
-            time.sleep(0.2)
+        # 주문별 취소 요청은 서로 독립적이므로 동시에 전송 (최대 4건)
+        with ThreadPoolExecutor(max_workers=min(4, len(orders))) as ex:
+            list(ex.map(lambda o: self._cancel_one(symbol, exch, o, headers_cancel), orders))
+        self.invalidate_balance()
         print_log(f"✅ {symbol} 취소 완료")
 
+    def _cancel_one(self, symbol, exch, ord, headers):
+        url_cancel = f"{self.base_url}/uapi/overseas-stock/v1/trading/order-rvsecncl"
+        data = {
+            "CANO": self.cfg['CANO'], "ACNT_PRDT_CD": self.cfg['ACNT_PRDT_CD'],
+            "OVRS_EXCG_CD": exch, "PDNO": symbol, "ORGN_ODNO": ord['odno'],
+            "RVSE_CNCL_DVSN_CD": "02", "ORD_QTY": str(ord['nccs_qty']), "OVRS_ORD_UNPR": "0", "ORD_SVR_DVSN_CD": "0"
+        }
+        try:
+            self.session.post(url_cancel, headers=headers, json=data, timeout=KIS_TIMEOUT)
+        except Exception as e:
+            print_log(f"❌ {symbol} 취소 에러 ({ord['odno']}): {e}")
+
+    def cancel_and_send(self, symbol, exch, qty, price, side, ord_type="00"):
+        # 같은 방향/수량의 미체결 1건만 있으면 정정(가격 변경) 1회로 처리, 그 외에는 취소 후 신규 주문
+        orders = self.get_open_orders(symbol, exch)
+        side_cd = "01" if side == "SELL" else "02"  # sll_buy_dvsn_cd (01:매도, 02:매수)
+        if len(orders) == 1 and orders[0].get('sll_buy_dvsn_cd') == side_cd and int(orders[0]['nccs_qty']) == qty:
+            if self._modify_order(symbol, exch, orders[0], price): return True
+        self.cancel_all_orders(symbol, exch, orders)
+        return self.send_order(symbol, exch, qty, price, side, ord_type)
+
+    def _modify_order(self, symbol, exch, ord, price):
+        url = f"{self.base_url}/uapi/overseas-stock/v1/trading/order-rvsecncl"
+        tr_id = "TTTT1004U" if "REAL" in MODE else "VTTT1004U"
+        headers = self.get_header(tr_id)
+        data = {
+            "CANO": self.cfg['CANO'], "ACNT_PRDT_CD": self.cfg['ACNT_PRDT_CD'],
+            "OVRS_EXCG_CD": exch, "PDNO": symbol, "ORGN_ODNO": ord['odno'],
+            "RVSE_CNCL_DVSN_CD": "01", "ORD_QTY": str(ord['nccs_qty']), "OVRS_ORD_UNPR": str(price), "ORD_SVR_DVSN_CD": "0"
+        }
+        try:
+            res = self.session.post(url, headers=headers, json=data, timeout=KIS_TIMEOUT).json()
+            if res['rt_cd'] == '0':
+                self.invalidate_balance()
+                msg = f"✏️ 정정 주문 전송: {symbol} {ord['nccs_qty']}주 @ ${price}"
+                print_log(f"✅ {msg}")
+                send_discord(msg)
+                return True
+            print_log(f"❌ 정정 실패: {res['msg1']} ({res['msg_cd']})")
+        except Exception as e:
+            print_log(f"❌ 정정 에러: {e}")
+        return False
+
     def send_order(self, symbol, exch, qty, price, side, ord_type="00"):
         tr_id = "TTTT1002U" if side == "BUY" else "TTTT1006U"
         if "REAL" not in MODE: tr_id = "VTTT1002U" if side == "BUY" else "VTTT1006U"
@@ -383,8 +667,9 @@ class KisUS:
         }
         if price == 0: data["OVRS_ORD_UNPR"] = "0"
         try:
-            res = requests.post(url, headers=headers, json=data).json()
+            res = self.session.post(url, headers=headers, json=data, timeout=KIS_TIMEOUT).json()
             if res['rt_cd'] == '0':
+                self.invalidate_balance()
                 msg = f"{'🚀 매수' if side=='BUY' else '👋 매도'} 주문 전송: {symbol} {qty}주 @ ${price} ({ord_type})"
                 print_log(f"✅ {msg}")
                 send_discord(msg)
@@ -399,38 +684,96 @@ class KisUS:
 # ==========================================
 # [6. 기술적 지표]
 # ==========================================
+@njit(cache=True)
+def _ewm_step(s, w, x, alpha):
+    # ewm(adjust=False) 1스텝. NaN 입력은 값을 유지하되 가중치는 감쇠 (pandas ignore_na=False 와 동일)
+    if s != s: return x, 1.0
+    w *= 1.0 - alpha
+    if x == x:
+        s = (w * s + alpha * x) / (w + alpha)
+        w = 1.0
+    return s, w
+
+@njit(cache=True)
+def _ind_kernel(high, low, close, n=14):
+    # SMA20/전일 SMA20/SMA120/20일 표준편차/ADX 를 한 번의 순회로 계산
+    size = len(close)
+
+    sum120 = 0.0
+    for i in range(size - 120, size):
+        sum120 += close[i]
+    sum20 = 0.0
+    for i in range(size - 20, size):
+        sum20 += close[i]
+    sma20 = sum20 / 20
+    prev_sma20 = (sum20 - close[size - 1] + close[size - 21]) / 20
+    sma120 = sum120 / 120
+
+    # 표본표준편차 (ddof=1, pandas rolling().std() 와 동일)
+    sq = 0.0
+    for i in range(size - 20, size):
+        sq += (close[i] - sma20) ** 2
+    std_dev = (sq / 19) ** 0.5
+
+    # TR/+DM/-DM 을 ewm(alpha=1/n, adjust=False) 와 동일한 점화식으로 평활
+    # (pandas 와 같이 첫 봉부터 시작, TR 은 NaN 을 제외한 최댓값, NaN 봉은 건너뜀)
+    alpha = 1.0 / n
+    nan = float('nan')
+    tr_s = pdm_s = mdm_s = adx = nan
+    tr_w = pdm_w = mdm_w = adx_w = 1.0
+    for i in range(size):
+        tr = high[i] - low[i]
+        pdm = mdm = 0.0
+        if i > 0:
+            hc = abs(high[i] - close[i - 1])
+            lc = abs(low[i] - close[i - 1])
+            if hc == hc and (tr != tr or hc > tr): tr = hc
+            if lc == lc and (tr != tr or lc > tr): tr = lc
+            up = high[i] - high[i - 1]
+            down = low[i - 1] - low[i]
+            # NaN 비교는 False 이므로 결측 봉의 DM 은 0
+            if up > down and up > 0: pdm = up
+            if down > up and down > 0: mdm = down
+        tr_s, tr_w = _ewm_step(tr_s, tr_w, tr, alpha)
+        pdm_s, pdm_w = _ewm_step(pdm_s, pdm_w, pdm, alpha)
+        mdm_s, mdm_w = _ewm_step(mdm_s, mdm_w, mdm, alpha)
+        dx = nan
+        if tr_s > 0:
+            pdi = pdm_s / tr_s * 100
+            mdi = mdm_s / tr_s * 100
+            if pdi + mdi > 0: dx = abs(pdi - mdi) / (pdi + mdi) * 100
+        adx, adx_w = _ewm_step(adx, adx_w, dx, alpha)
+
+    return sma20, prev_sma20, sma120, std_dev, adx
+
+_ind_cache = {}  # symbol -> (hist, 지표). DataProvider 캐시 프레임이 바뀌기 전까지 재사용
+
 def calculate_indicators(hist):
     if hist is None or len(hist) < 120: return None
-    df = hist.copy()
-    
-    sma20 = df['Close'].rolling(window=20).mean().iloc[-1]
-    sma120 = df['Close'].rolling(window=120).mean().iloc[-1]
-    std_dev = df['Close'].rolling(window=20).std().iloc[-1] 
-    bb_lower = sma20 - (2 * std_dev)
-    
-    prev_sma20 = df['Close'].rolling(window=20).mean().iloc[-2]
-    prev_close = df['Close'].iloc[-2]
-    today_open = df['Open'].iloc[-1]
+    sym = hist.attrs.get('symbol')
+    cached = _ind_cache.get(sym)
+    if cached and cached[0] is hist: return cached[1]
+    inds = _calculate_indicators(hist)
+    if sym: _ind_cache[sym] = (hist, inds)
+    return inds
 
-    df['up'] = df['High'] - df['High'].shift(1)
-    df['down'] = df['Low'].shift(1) - df['Low']
-    df['TR'] = pd.concat([df['High']-df['Low'], (df['High']-df['Close'].shift(1)).abs(), (df['Low']-df['Close'].shift(1)).abs()], axis=1).max(axis=1)
-    
-    df['+DM'] = 0.0; df.loc[(df['up'] > df['down']) & (df['up'] > 0), '+DM'] = df['up']
-    df['-DM'] = 0.0; df.loc[(df['down'] > df['up']) & (df['down'] > 0), '-DM'] = df['down']
-    
-    n = 14; alpha = 1/n
-    df['TR_s'] = df['TR'].ewm(alpha=alpha, adjust=False).mean()
-    df['+DM_s'] = df['+DM'].ewm(alpha=alpha, adjust=False).mean()
-    df['-DM_s'] = df['-DM'].ewm(alpha=alpha, adjust=False).mean()
-    df['ADX'] = (abs(((df['+DM_s']/df['TR_s'])*100) - ((df['-DM_s']/df['TR_s'])*100)) / (((df['+DM_s']/df['TR_s'])*100) + ((df['-DM_s']/df['TR_s'])*100)) * 100).ewm(alpha=alpha, adjust=False).mean()
+def _calculate_indicators(hist):
+    o, h, l, c = np.ascontiguousarray(hist[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64).T)
+    sma20, prev_sma20, sma120, std_dev, adx = _ind_kernel(h, l, c)
 
     return {
-        "SMA20": sma20, "SMA120": sma120, "BB_LOW": bb_lower,
-        "PREV_SMA20": prev_sma20, "PREV_CLOSE": prev_close,
-        "TODAY_OPEN": today_open, "ADX": df['ADX'].iloc[-1], "BB_UP": sma20 + (2*std_dev)
+        "SMA20": sma20, "SMA120": sma120, "BB_LOW": sma20 - (2 * std_dev),
+        "PREV_SMA20": prev_sma20, "PREV_CLOSE": c[-2],
+        "TODAY_OPEN": o[-1], "TODAY_LOW": l[-1], "ADX": adx, "BB_UP": sma20 + (2*std_dev)
     }
 
+# 최초 명령 응답 중 JIT 컴파일 지연이 생기지 않도록 import 시점에 미리 컴파일
+# (cache=True 이므로 두 번째 실행부터는 __pycache__ 에서 바로 로드)
+try:
+    _ind_kernel(np.zeros(130), np.zeros(130), np.zeros(130))
+except Exception as e:
+    print_log(f"⚠️ [JIT] 지표 커널 컴파일 실패: {e}")
+
 # ==========================================
 # [7. Termux App (CLI)]
 # ==========================================
@@ -510,7 +853,7 @@ class TermuxApp:
             print_log(f"   가격 설정: ${curr} -> ${price} (매도)")
             
             # 매도 테스트의 경우 잔고가 있어야 함 (없으면 거부됨)
-            holdings, _ = self.kis.get_balance()
+            holdings = self.kis._fetch_holdings() or {}
             if symbol not in holdings or holdings[symbol]['qty'] <= 0:
                 print_log("⚠️ 주의: 해당 종목 잔고가 없어 매도 주문이 거부될 수 있습니다.")
 
@@ -524,6 +867,7 @@ class TermuxApp:
             if not is_open: print_log(f"🌑 현재 장 마감 상태입니다. (NY {cur_time})")
 
             holdings, cash = self.kis.get_balance()
+            prices = DataProvider.get_current_prices([t['symbol'] for t in TARGETS])
             total_stock_val = 0.0
 
             # 보유 종목 리스트 생성 (없는 종목도 포함)
@@ -533,8 +877,8 @@ class TermuxApp:
                 qty = holdings.get(sym, {}).get('qty', 0)
                 avg = holdings.get(sym, {}).get('avg_price', 0.0)
                 
-                # 현재가는 실시간 API 데이터가 없으면 yfinance로 조회
-                cur_price = DataProvider.get_current_price(sym)
+                # 현재가는 위에서 일괄 조회한 yfinance 시세 사용
+                cur_price = prices.get(sym)
                 if not cur_price and qty > 0: 
                     # API 잔고에 평가금액 역산 시도 or avg_price 사용 (fallback)
                     cur_price = avg 
@@ -585,6 +929,8 @@ class TermuxApp:
             print_log(f"🌑 현재는 장 마감 상태입니다. (NY {cur_time})")
             print_log("   가장 최근 데이터를 기준으로 분석해드릴게요!\n")
 
+        DataProvider.prefetch_histories([t['symbol'] for t in TARGETS], 130)
+
         for target in TARGETS:
             sym = target['symbol']
             print_log(f"📌 [{sym}] 분석 결과")
@@ -599,8 +945,9 @@ class TermuxApp:
                 print_log("   ⚠️ 지표 계산에 필요한 데이터가 부족해요.")
                 continue
             
-            curr = DataProvider.get_current_price(sym)
-            if not curr: curr = hist['Close'].iloc[-1]
+            # 장 마감 중에는 실시간가 = 최근 종가이므로 추가 조회 생략
+            curr = DataProvider.get_current_price(sym) if is_open else None
+            if not curr: curr = float(hist['Close'].iloc[-1])
 
             # 조건 분석
             # 1. 120일선 (장기 추세)
@@ -672,113 +1019,147 @@ class TermuxApp:
 # ==========================================
 # [8. 전략 스레드]
 # ==========================================
+def _ny_at(day, hour, minute):
+    # 날짜 + 시각을 DST 를 반영한 뉴욕 시간으로 변환
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=NY_TZ)
+
+def _next_wake(now_ny):
+    # 장외 시간에 다음으로 할 일이 생기는 시각 (장 시작 직전 09:29 / 마감 안내 16:05)
+    is_weekday = now_ny.weekday() < 5
+    if is_weekday and now_ny < _ny_at(now_ny, 9, 29):
+        return _ny_at(now_ny, 9, 29)
+    if is_weekday and now_ny < _ny_at(now_ny, 16, 0):
+        return now_ny + timedelta(seconds=60)
+    if is_weekday and now_ny < _ny_at(now_ny, 16, 5):
+        return _ny_at(now_ny, 16, 5)
+
+    day = now_ny.date() + timedelta(days=1)
+    while day.weekday() >= 5: day += timedelta(days=1)
+    return _ny_at(day, 9, 29)
+
+def _sleep_until_next_wake(now_ny):
+    # 단말 절전 등으로 늦게 깨어나는 경우를 고려해 최대 1시간 단위로 나누어 대기
+    # 같은 tzinfo 끼리의 뺄셈은 DST 변경을 무시하므로 timestamp 로 계산
+    wait = _next_wake(now_ny).timestamp() - now_ny.timestamp()
+    time.sleep(min(3600, max(1, wait)))
+
+def _phase_a_one(kis, target, holdings):
+    sym = target['symbol']
+    if sym not in holdings: return
+    kis.cancel_all_orders(sym, target['exch'])
+    # 캐시된 데이터를 활용하여 효율적 조회
+    hist = DataProvider.get_daily_history(sym, days=30)
+    if hist is None: return
+    inds = calculate_indicators(hist)
+    if not inds: return
+    sell_qty = int(holdings[sym]['qty'] * 0.5)
+    if sell_qty > 0:
+        print_log(f"[Phase A] {sym} 50% 익절 주문 (${inds['BB_UP']:.2f})")
+        kis.send_order(sym, target['exch'], sell_qty, round(inds['BB_UP'], 2), "SELL", "00")
+
 def strategy_thread(kis):
-    ny_tz = pytz.timezone('America/New_York')
     print_log("🤖 미국치킨 V1.0 (Termux) 가동")
     
     prev_holdings_snapshot = {}
     last_wait_log = 0 
+    history_day = None  # 장 시작 전 일봉 선조회를 마친 날짜
 
     while True:
         try:
-            now_ny = datetime.now(ny_tz)
-            current_time = now_ny.strftime("%H:%M")
+            now_ny = datetime.now(NY_TZ)
+            minute = now_ny.hour * 60 + now_ny.minute
             
             # 주말 체크 (0:월 ~ 6:일)
             if now_ny.weekday() >= 5:
                 if time.time() - last_wait_log > 3600:
-                    print_log(f"⏳ 주말 휴장 중... (NY {current_time})")
+                    print_log(f"⏳ 주말 휴장 중... (NY {now_ny:%H:%M})")
                     last_wait_log = time.time()
-                time.sleep(60)
+                _sleep_until_next_wake(now_ny)
                 continue
 
             # 장 시작 전 / 장 마감 후 로직
-            if current_time < "09:30":
+            if minute < MIN_OPEN:
+                # 09:29 에 전 종목 일봉을 미리 받아 Phase A 가 캐시를 사용하도록 함
+                if minute >= MIN_PRE_OPEN and history_day != now_ny.date():
+                    DataProvider.prefetch_daily_history([t['symbol'] for t in TARGETS])
+                    history_day = now_ny.date()
                 if time.time() - last_wait_log > 1800:
-                    print_log(f"⏳ 장 시작 대기 중... (현재 NY: {current_time})")
+                    print_log(f"⏳ 장 시작 대기 중... (현재 NY: {now_ny:%H:%M})")
                     last_wait_log = time.time()
-                time.sleep(60)
+                _sleep_until_next_wake(now_ny)
                 continue
             
-            if current_time >= "16:00":
+            if minute >= MIN_CLOSE:
                 if not status_mgr.data.get("daily_reset_done"):
                     status_mgr.reset_daily()
                     status_mgr.data["daily_reset_done"] = True
                     print_log("🌙 장 마감. 금일 데이터 리셋 완료.")
-                if current_time == "16:05": print_log("👋 [안내] 16:05 경과. 봇 종료 가능.")
-                time.sleep(60) 
+                if minute >= MIN_CLOSE_NOTICE and not status_mgr.data.get('notified_1605'):
+                    print_log("👋 [안내] 16:05 경과. 봇 종료 가능.")
+                    status_mgr.set_notified_1605(True)
+                _sleep_until_next_wake(now_ny)
                 continue
             
             if status_mgr.data.get("daily_reset_done"): status_mgr.data["daily_reset_done"] = False
 
-            # 루프 1회차 동기화
+            # 루프 1회차 동기화 (150초 캐시, 주문/정정/취소 시 무효화)
             holdings, cash = kis.get_balance()
             
-            # 외부 거래 감지
-            for sym in TARGETS:
-                symbol = sym['symbol']
-                current_qty = holdings.get(symbol, {}).get('qty', 0)
-                prev_qty = prev_holdings_snapshot.get(symbol, 0)
-                if current_qty > prev_qty: status_mgr.reset_max_profit(symbol)
-                prev_holdings_snapshot[symbol] = current_qty
+            ignore_snap = status_mgr.snapshot_ignore()
+            now_ts = time.time()
+
+            # 외부 거래 감지 (이번 회차 수량 스냅샷과 이전 스냅샷 비교)
+            curr_q = {sym: holdings.get(sym, {}).get('qty', 0) for sym in SYMBOL_IDX}
+            for sym, qty in curr_q.items():
+                if qty > prev_holdings_snapshot.get(sym, 0): status_mgr.reset_max_profit(sym)
+            prev_holdings_snapshot = curr_q
 
             # [Phase A] 09:30 ~ 09:40 (시초가 갭상승 익절)
-            if "09:30" <= current_time < "09:40":
+            if MIN_OPEN <= minute < MIN_PHASE_A_END:
                 if not status_mgr.data['phase_a_done']:
-                    for target in TARGETS:
-                        sym = target['symbol']
-                        if sym in holdings:
-                            kis.cancel_all_orders(sym, target['exch'])
-                            # 캐시된 데이터를 활용하여 효율적 조회
-                            hist = DataProvider.get_daily_history(sym, days=30)
-                            if hist is not None:
-                                inds = calculate_indicators(hist)
-                                if inds:
-                                    sell_qty = int(holdings[sym]['qty'] * 0.5)
-                                    if sell_qty > 0:
-                                        print_log(f"[Phase A] {sym} 50% 익절 주문 (${inds['BB_UP']:.2f})")
-                                        kis.send_order(sym, target['exch'], sell_qty, round(inds['BB_UP'], 2), "SELL", "00")
+                    # 종목별 취소/조회/주문을 동시에 처리
+                    with ThreadPoolExecutor(max_workers=len(TARGETS)) as ex:
+                        list(ex.map(lambda t: _phase_a_one(kis, t, holdings), TARGETS))
                     status_mgr.set_phase_a_done(True)
 
             # [Phase B] 09:30 ~ 15:50 (Trailing Stop & Stop Loss)
-            if "09:30" <= current_time < "15:50":
-                for target in TARGETS:
-                    sym = target['symbol']
-                    if status_mgr.is_sync_ignored(sym): continue
-                    
-                    if sym in holdings:
-                        info = holdings[sym]
-                        curr = DataProvider.get_current_price(sym)
-                        if not curr: continue
-                        
-                        rate = (curr - info['avg_price']) / info['avg_price'] * 100
-                        status_mgr.update_max_profit(sym, rate)
-                        max_rate = status_mgr.get_max_profit(sym)
-                        market_sell = round(curr * 0.95, 2)
-
-                        if rate <= -5.0:
+            if MIN_OPEN <= minute < MIN_PHASE_C_START:
+                held = [i for i, sym in enumerate(SYMBOLS) if sym in holdings and now_ts >= ignore_snap.get(sym, 0)]
+                prices = DataProvider.get_current_prices([str(SYMBOLS[i]) for i in held]) if held else {}
+                idx = np.array([i for i in held if prices.get(SYMBOLS[i])], dtype=np.int64)
+
+                if len(idx):
+                    syms = [str(sym) for sym in SYMBOLS[idx]]
+                    avgs = np.array([holdings[sym]['avg_price'] for sym in syms])
+                    currs = np.array([prices[sym] for sym in syms])
+                    rates = (currs - avgs) / avgs * 100
+                    for sym, rate in zip(syms, rates):
+                        status_mgr.update_max_profit(sym, float(rate))
+                    max_rates = np.array([status_mgr.get_max_profit(sym) for sym in syms])
+
+                    stop_mask = rates <= -5.0
+                    tsl_mask = ~stop_mask & (max_rates >= 10.0) & ((max_rates - rates) >= 3.0)
+
+                    # 손절/익절 조건이 발생한 종목만 주문 처리
+                    for j in np.flatnonzero(stop_mask | tsl_mask):
+                        sym, exch = syms[j], str(EXCHS[idx[j]])
+                        if stop_mask[j]:
                             print_log(f"🚨 [손절] {sym} -5% 도달")
-                            kis.cancel_all_orders(sym, target['exch'])
-                            if kis.send_order(sym, target['exch'], info['qty'], market_sell, "SELL", "00"):
-                                status_mgr.set_ignore_sync(sym, 3600)
-                        elif max_rate >= 10.0 and (max_rate - rate) >= 3.0:
+                        else:
                             print_log(f"📉 [익절] {sym} 고점 대비 하락")
-                            kis.cancel_all_orders(sym, target['exch'])
-                            if kis.send_order(sym, target['exch'], info['qty'], market_sell, "SELL", "00"):
-                                status_mgr.set_ignore_sync(sym, 3600)
+                        if kis.cancel_and_send(sym, exch, holdings[sym]['qty'], round(float(currs[j]) * 0.95, 2), "SELL", "00"):
+                            status_mgr.set_ignore_sync(sym, 3600)
 
-            # [Phase C] 15:50 ~ 16:00 (진입 판단)
-            if "15:50" <= current_time < "16:00":
+            # [Phase C] 15:50 ~ 16:00 (진입 판단, 하루 1회)
+            if MIN_PHASE_C_START <= minute < MIN_CLOSE and status_mgr.data.get('phase_c_date') != now_ny.date().isoformat():
                 print_log("⚖️ [Phase C] 장 마감 진입 판단")
                 
-                # Equity 계산
+                # Equity 계산 (현재가는 한 번에 조회하여 매수 판단/TWAP 1회차에 재사용)
+                curr_prices = DataProvider.get_current_prices([t['symbol'] for t in TARGETS])
                 curr_vals = 0.0
-                curr_prices = {}
-                for t in TARGETS:
-                    p = DataProvider.get_current_price(t['symbol'])
-                    if p: curr_prices[t['symbol']] = p
-                    if t['symbol'] in holdings and p:
-                        curr_vals += holdings[t['symbol']]['qty'] * p
+                for sym, p in curr_prices.items():
+                    if sym in holdings:
+                        curr_vals += holdings[sym]['qty'] * p
                 
                 # 통합증거금 포함 총 자본
                 total_equity = cash + curr_vals
@@ -786,13 +1167,20 @@ def strategy_thread(kis):
                 print_log(f"💰 Equity: ${total_equity:,.2f} / Target: ${target_alloc:,.2f}")
 
                 buy_list = []
+                # 당일 봉이 반영된 일봉을 전 종목 동시에 갱신 (아래 종목별 조회는 캐시 사용)
+                DataProvider.prefetch_daily_history([t['symbol'] for t in TARGETS])
 
-                for target in TARGETS:
+                # 미체결 내역은 종목별로 동시에 조회
+                active = [t for t in TARGETS if now_ts >= ignore_snap.get(t['symbol'], 0)]
+                with ThreadPoolExecutor(max_workers=len(TARGETS)) as ex:
+                    open_orders = dict(zip([t['symbol'] for t in active],
+                                           ex.map(lambda t: kis.get_open_orders(t['symbol'], t['exch']), active)))
+
+                for target in active:
                     sym = target['symbol']
-                    if status_mgr.is_sync_ignored(sym): continue
                     
                     # 1. 미체결 확인
-                    if kis.get_open_orders(sym, target['exch']):
+                    if open_orders[sym]:
                         print_log(f"⏳ [중복방지] {sym} 미체결 존재. 진입 보류.")
                         continue
 
@@ -812,57 +1200,60 @@ def strategy_thread(kis):
                             status_mgr.set_ignore_sync(sym, 3600)
                         continue
                     
-                    # 4. 매수 로직 (ADX + SMA + Reclaim)
-                    cond_trend = curr > inds['SMA120'] # 장기 정배열
+                    # 4. 매수 로직 (ADX + SMA + Reclaim) - 앞 조건이 거짓이면 뒤 조건은 계산하지 않음
+                    if not curr > inds['SMA120']: continue # 장기 정배열 아님 (NaN 이면 통과하지 않음)
                     
                     # A전략: 골든크로스
                     cond_cross = (inds['PREV_CLOSE'] < inds['PREV_SMA20']) and (curr > inds['SMA20'])
                     
                     # B전략: 볼린저 밴드 하단 Reclaim (찌르고 회복)
-                    today_low = hist['Low'].iloc[-1]
-                    today_open = hist['Open'].iloc[-1]
-                    touched_low = today_low < inds['BB_LOW']
-                    reclaimed = curr > inds['BB_LOW']        
-                    is_green = curr > today_open             
-                    cond_reclaim = touched_low and reclaimed and is_green
-
-                    cond_adx = inds['ADX'] >= 25 # 강한 추세
+                    if not cond_cross:
+                        touched_low = inds['TODAY_LOW'] < inds['BB_LOW']
+                        reclaimed = curr > inds['BB_LOW']        
+                        is_green = curr > inds['TODAY_OPEN']             
+                        if not (touched_low and reclaimed and is_green): continue
+
+                    if not inds['ADX'] >= 25: # 강한 추세 아님 (NaN 포함)
+                        print_log(f"⚠️ [매수패스] {sym} 추세 약함 (ADX: {inds['ADX']:.1f} < 25)")
+                        continue
+
+                    # 가상 잔고 포함하여 필요 금액 계산
+                    virtual_qty = status_mgr.get_virtual_qty(sym, real_qty)
+                    held_amt = virtual_qty * curr
+                    needed_amt = target_alloc - held_amt
                     
-                    if cond_trend and (cond_cross or cond_reclaim):
-                        if cond_adx:
-                            # 가상 잔고 포함하여 필요 금액 계산
-                            virtual_qty = status_mgr.get_virtual_qty(sym, real_qty)
-                            held_amt = virtual_qty * curr
-                            needed_amt = target_alloc - held_amt
-                            
-                            if needed_amt > 10:
-                                log_msg = "골든크로스" if cond_cross else "밴드회복"
-                                print_log(f"📈 [매수신호] {sym} ({log_msg}, ADX:{inds['ADX']:.1f})")
-                                buy_list.append({
-                                    "target": target,
-                                    "amount": needed_amt,
-                                    "price": curr,
-                                    "qty": real_qty
-                                })
-                        else:
-                            print_log(f"⚠️ [매수패스] {sym} 추세 약함 (ADX: {inds['ADX']:.1f} < 25)")
+                    if needed_amt > 10:
+                        log_msg = "골든크로스" if cond_cross else "밴드회복"
+                        print_log(f"📈 [매수신호] {sym} ({log_msg}, ADX:{inds['ADX']:.1f})")
+                        buy_list.append({
+                            "target": target,
+                            "chunks": [needed_amt / 3.0] * 3,  # TWAP 회차별 매수 금액
+                            "price": curr,
+                            "qty": real_qty
+                        })
 
                 # [Phase D] TWAP 매수
                 if buy_list:
+                    # 시작 시각 기준 0/150/300초 후에 회차별 주문 (주문 지연이 다음 회차로 누적되지 않음)
+                    twap_start = datetime.now(NY_TZ)
+                    twap_times = [twap_start + timedelta(seconds=sec) for sec in (0, 150, 300)]
+                    deadline = _ny_at(twap_start, 15, 59)
                     for i in range(3):
-                        now_str = datetime.now(ny_tz).strftime("%H:%M:%S")
-                        is_last = (now_str >= "15:59:00")
-                        rem_mult = 3 - i
+                        wait = twap_times[i].timestamp() - time.time()
+                        if wait > 0: time.sleep(wait)
+                        # 마지막 회차이거나 예정 시각이 15:59 이후면 남은 금액을 모두 주문
+                        is_last = i == 2 or twap_times[i] >= deadline
                         
                         print_log(f"💸 TWAP 매수 ({i+1}/3)")
+                        prices = curr_prices if i == 0 else DataProvider.get_current_prices([o['target']['symbol'] for o in buy_list])
                         
                         for order in buy_list:
                             sym = order['target']['symbol']
                             exch = order['target']['exch']
-                            curr = DataProvider.get_current_price(sym) or order['price']
+                            curr = prices.get(sym) or order['price']
                             
-                            chunk = order['amount'] / 3.0
-                            if is_last: chunk *= rem_mult
+                            # 마지막 회차면 남은 회차 금액을 모두 합산
+                            chunk = sum(order['chunks'][i:]) if is_last else order['chunks'][i]
                             
                             qty = int(chunk / curr)
                             if qty > 0:
@@ -870,9 +1261,12 @@ def strategy_thread(kis):
                                     status_mgr.record_pending_buy(sym, qty, order['qty'])
                         
                         if is_last: break
-                        if i < 2: time.sleep(150)
                 
-                time.sleep(600)
+                status_mgr.set_phase_c_date(now_ny.date().isoformat())
+                # 장 마감(16:00)까지 더 할 일이 없으므로 바로 대기
+                wait = _ny_at(now_ny, 16, 0).timestamp() - time.time()
+                if wait > 0: time.sleep(wait)
+                continue
 
             time.sleep(60)
 
@@ -881,6 +1275,8 @@ def strategy_thread(kis):
             time.sleep(60)
 
 if __name__ == "__main__":
+    # SIGTERM 으로 종료될 때도 atexit 를 거쳐 상태 파일을 기록
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
     kis = KisUS()
     # GUI 제거: TermuxApp이 CLI 역할
     app = TermuxApp(kis)